@@ -1,69 +1,389 @@
-from sklearn.decomposition import PCA
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+import json
+import os
+from pathlib import Path
+from sklearn.decomposition import PCA, TruncatedSVD
 from sklearn.preprocessing import StandardScaler
+from sklearn.utils.sparsefuncs import inplace_column_scale, mean_variance_axis
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import scipy.sparse as sp
 
-def prep(df, df_name):
-    df.columns = ['chr1', 'start1', 'end1', 'chr2', 'start2', 'end2', 'value']
-    df['start1'] = df['start1'].astype(str)
-    df['end1'] = df['end1'].astype(str)
-    df['start2'] = df['start2'].astype(str)
-    df['end2'] = df['end2'].astype(str)
-    df['tile'] = df['chr1'] + ':' + df['start1'] + '-' + df['end1'] + ';' + df['chr2'] + ':' + df['start2'] + '-' + df['end2']
-    new_df = df[['tile', 'value']]
-    new_df.columns = ["location", df_name]
+COLS = ('chr1', 'start1', 'end1', 'chr2', 'start2', 'end2', 'value')
+SEP = (':', '-', ';', ':', '-')
+PCS = ['PC1', 'PC2', 'PC3']
+MAX_LABELS = 50
+GPU_MIN_SIZE = 1 << 26
+SCHEMA = {'chr1': pa.dictionary(pa.int32(), pa.string()), 'start1': pa.int64(), 'end1': pa.int64(),
+          'chr2': pa.dictionary(pa.int32(), pa.string()), 'start2': pa.int64(), 'end2': pa.int64(), 'value': pa.float64()}
+DTYPES = {'chr1': 'category', 'start1': 'int64', 'end1': 'int64',
+          'chr2': 'category', 'start2': 'int64', 'end2': 'int64', 'value': 'float64'}
+CHROMS = [f'chr{i}' for i in range(1, 23)] + ['chrX', 'chrY', 'chrM']
+PAIR_BITS = 32
+PAIR_MASK = (1 << PAIR_BITS) - 1
+KEY_LAYOUT = f'pairs,{PAIR_BITS}'
+
+try:
+    from numba import njit, prange
+except ImportError:
+    pack_keys = None
+else:
+    @njit(parallel=True, cache=True)
+    def pack_keys(chr1_ids, start1, chr2_ids, start2, bin_size, chrom_keys, bin_keys):
+        for i in prange(chrom_keys.shape[0]):
+            chrom_keys[i] = (chr1_ids[i] << PAIR_BITS) | chr2_ids[i]
+            bin_keys[i] = ((start1[i] // bin_size) << PAIR_BITS) | (start2[i] // bin_size)
+
+try:
+    import cupy as cp
+except ImportError:
+    cp = None
+try:
+    import cuml
+except ImportError:
+    cuml = None
+
+def format_tiles(chr1, start1, end1, chr2, start2, end2):
+    parts = [pc.cast(pa.array(c if i % 3 == 0 else np.asarray(c, dtype='int64')), pa.string())
+             for i, c in enumerate((chr1, start1, end1, chr2, start2, end2))]
+    args = [a for pair in zip(parts, SEP) for a in pair]
+    tile = pc.binary_join_element_wise(*args, parts[-1], '')
+    return pd.array(tile, dtype='string[pyarrow]')
+
+def order_chroms(names):
+    names = set(names)
+    ordered = [c for c in CHROMS if c in names] + sorted(names.difference(CHROMS))
+    return {name: i for i, name in enumerate(ordered, 1)}
+
+def chrom_ids(chrom, chroms):
+    chrom = pa.array(chrom)
+    if isinstance(chrom, pa.ChunkedArray):
+        chrom = chrom.combine_chunks()
+    if not pa.types.is_dictionary(chrom.type):
+        chrom = chrom.dictionary_encode()
+    names = pc.cast(chrom.dictionary, pa.string()).to_pylist()
+    for name in names:
+        chroms.setdefault(name, len(chroms) + 1)
+    lut = np.array([chroms[name] for name in names], dtype=np.int64)
+    return lut[chrom.indices.to_numpy()]
+
+def split_keys(keys, bits):
+    return keys >> bits, keys & ((1 << bits) - 1)
+
+def encode_locations(chr1, start1, chr2, start2, bin_size, chroms):
+    start1 = np.asarray(start1, dtype=np.int64)
+    start2 = np.asarray(start2, dtype=np.int64)
+    if max(start1.max(initial=0), start2.max(initial=0)) // bin_size > PAIR_MASK >> 1:
+        raise ValueError(f"Bin index exceeds {PAIR_MASK >> 1}; bin_size={bin_size} is too small to pack")
+    chr1_ids, chr2_ids = chrom_ids(chr1, chroms), chrom_ids(chr2, chroms)
+    if pack_keys is not None:
+        chrom_keys, bin_keys = np.empty(len(start1), dtype=np.int64), np.empty(len(start1), dtype=np.int64)
+        pack_keys(chr1_ids, start1, chr2_ids, start2, bin_size, chrom_keys, bin_keys)
+        return chrom_keys, bin_keys
+    return (chr1_ids << PAIR_BITS) | chr2_ids, ((start1 // bin_size) << PAIR_BITS) | (start2 // bin_size)
+
+def key_bits(n_chroms, n_bins):
+    chrom_bits, bin_bits = n_chroms.bit_length(), max(n_bins - 1, 1).bit_length()
+    if 2 * (chrom_bits + bin_bits) > 63:
+        return PAIR_BITS, PAIR_BITS
+    return chrom_bits, bin_bits
+
+def index_locations(chrom_keys, bin_keys, chroms, new_chroms, chrom_bits, bin_bits):
+    lut = np.zeros(len(chroms) + 1, dtype=np.int64)
+    lut[list(chroms.values())] = [new_chroms[name] for name in chroms]
+    chr1_ids, chr2_ids = split_keys(chrom_keys, PAIR_BITS)
+    chrom_keys = (lut[chr1_ids] << chrom_bits) | lut[chr2_ids]
+    if chrom_bits == PAIR_BITS:
+        return pd.MultiIndex.from_arrays([chrom_keys, bin_keys], names=['chroms', 'bins'])
+    bin1, bin2 = split_keys(bin_keys, PAIR_BITS)
+    return pd.Index((chrom_keys << 2 * bin_bits) | (bin1 << bin_bits) | bin2, name='location')
+
+def decode_locations(keys, bin_size, chroms, chrom_ends, chrom_bits, bin_bits):
+    if isinstance(keys, pd.MultiIndex):
+        chrom_keys, bin_keys = (keys.get_level_values(i).to_numpy(dtype=np.int64) for i in range(2))
+    else:
+        chrom_keys, bin_keys = split_keys(np.asarray(keys, dtype=np.int64), 2 * bin_bits)
+    names = np.array([None, *chroms], dtype=object)
+    ends = np.array([0, *(chrom_ends[name] for name in chroms)], dtype=np.int64)
+    chr1_ids, chr2_ids = split_keys(chrom_keys, chrom_bits)
+    start1, start2 = (b * bin_size for b in split_keys(bin_keys, bin_bits))
+    return pd.Index(format_tiles(names[chr1_ids], start1, np.minimum(start1 + bin_size, ends[chr1_ids]),
+                                 names[chr2_ids], start2, np.minimum(start2 + bin_size, ends[chr2_ids])),
+                    name='location')
+
+def infer_bin_size(filename, n_rows=10000):
+    widths = [0]
+    with open(f'{filename}.txt') as f:
+        for line in islice(f, 1, n_rows + 1):
+            fields = line.split('\t')
+            widths += [int(fields[2]) - int(fields[1]), int(fields[5]) - int(fields[4])]
+    return max(widths)
+
+def check_chrom_ends(source, short_ends, chrom_ends):
+    for name, end in short_ends.items():
+        if end != chrom_ends[name]:
+            raise ValueError(f"{source}: {name} has a short bin ending at {end}, "
+                             f"but tiles on it extend to {chrom_ends[name]}")
+
+def prep(df, df_name, bin_size, chroms, chrom_ends, short_ends):
+    df.columns = list(COLS)
+    start1 = df['start1'].to_numpy(dtype=np.int64)
+    start2 = df['start2'].to_numpy(dtype=np.int64)
+    end1 = df['end1'].to_numpy(dtype=np.int64)
+    end2 = df['end2'].to_numpy(dtype=np.int64)
+    if (start1 % bin_size).any() or (start2 % bin_size).any():
+        raise ValueError(f"{df_name}: tile starts are not on a {bin_size} bp grid")
+    width1, width2 = end1 - start1, end2 - start2
+    if (width1 > bin_size).any() or (width2 > bin_size).any() or (width1 <= 0).any() or (width2 <= 0).any():
+        raise ValueError(f"{df_name}: tiles are not {bin_size} bp bins")
+    chrom_keys, bin_keys = encode_locations(df['chr1'], start1, df['chr2'], start2, bin_size, chroms)
+    chr1_ids, chr2_ids = split_keys(chrom_keys, PAIR_BITS)
+    observed = np.zeros(len(chroms) + 1, dtype=np.int64)
+    np.maximum.at(observed, chr1_ids, end1)
+    np.maximum.at(observed, chr2_ids, end2)
+    for name, i in chroms.items():
+        if observed[i] > chrom_ends.get(name, 0):
+            chrom_ends[name] = int(observed[i])
+    names = [None, *chroms]
+    for ids, end, width in ((chr1_ids, end1, width1), (chr2_ids, end2, width2)):
+        short = width < bin_size
+        for i, e in set(zip(ids[short].tolist(), end[short].tolist())):
+            if short_ends.setdefault(names[i], e) != e:
+                raise ValueError(f"{df_name}: {names[i]} has more than one bin shorter than {bin_size} bp")
+    new_df = pd.DataFrame({"chroms": chrom_keys, "bins": bin_keys, df_name: df['value'].to_numpy(dtype=np.float32)},
+                          index=df.index)
     return new_df
 
-def pca_drawing(data, prefix, components):
-    scaler = StandardScaler()
-    scaled_data = scaler.fit_transform(data.T)
-    pca = PCA(n_components=3)
-    pca_data = pca.fit_transform(scaled_data)
-    pca_df = pd.DataFrame(data=pca_data, columns=['PC1', 'PC2', 'PC3'], index=data.columns)
-    pca_df.to_csv(f'{prefix}.csv')
+def gram_eigh(gram, n_components, dtype):
+    w, v = np.linalg.eigh(gram.astype(np.float64))
+    w, v = w[::-1][:n_components], v[:, ::-1][:, :n_components].astype(dtype)
+    if len(w) < n_components:
+        w = np.pad(w, (0, n_components - len(w)))
+        v = np.pad(v, ((0, 0), (0, n_components - v.shape[1])))
+    w[w <= max(w[0], 0) * gram.shape[0] * np.finfo(dtype).eps] = 0
+    s = np.sqrt(w)
+    inv_s = np.divide(1, s, out=np.zeros_like(s), where=s > 0)
+    return s.astype(dtype), inv_s.astype(dtype), v
+
+def gram_pca_gpu(scaled_data, n_components):
+    x = cp.asarray(scaled_data)
+    s, inv_s, v = gram_eigh(cp.asnumpy(x @ x.T), n_components, scaled_data.dtype)
+    return v * s, cp.asnumpy((x.T @ cp.asarray(v)) * cp.asarray(inv_s))
+
+def cuml_pca(scaled_data, n_components):
+    pca = cuml.PCA(n_components=n_components, svd_solver='jacobi')
+    pca_data = cp.asnumpy(pca.fit_transform(cp.asarray(scaled_data)))
+    return pca_data, cp.asnumpy(pca.components_).T
+
+def use_gpu(gpu, module, scaled_data):
+    return gpu and cp is not None and module is not None and scaled_data.size >= GPU_MIN_SIZE
+
+def gram_pca(scaled_data, n_components, gpu=False):
+    if use_gpu(gpu, cp, scaled_data):
+        try:
+            return gram_pca_gpu(scaled_data, n_components)
+        except (RuntimeError, MemoryError) as e:
+            print(f"GPU PCA failed, falling back to CPU: {e}")
+    s, inv_s, v = gram_eigh(scaled_data @ scaled_data.T, n_components, scaled_data.dtype)
+    return v * s, (scaled_data.T @ v) * inv_s
+
+def randomized_pca(scaled_data, n_components, gpu=False):
+    if use_gpu(gpu, cuml, scaled_data):
+        try:
+            return cuml_pca(scaled_data, n_components)
+        except (RuntimeError, MemoryError) as e:
+            print(f"GPU PCA failed, falling back to CPU: {e}")
+    pca = PCA(n_components=n_components, svd_solver='randomized', n_oversamples=10, iterated_power=4,
+              random_state=0)
+    return pca.fit_transform(scaled_data), pca.components_.T
+
+def scale_rows(batch):
+    batch = batch.toarray() if sp.issparse(batch) else np.array(batch, dtype=np.float32)
+    batch -= batch.mean(axis=1, keepdims=True)
+    std = batch.std(axis=1, keepdims=True)
+    std[std == 0] = 1
+    batch /= std
+    return batch
+
+def streamed_pca(matrix, n_components, batch_size):
+    gram = np.zeros((matrix.shape[1], matrix.shape[1]), dtype=np.float64)
+    for start in range(0, matrix.shape[0], batch_size):
+        batch = scale_rows(matrix[start:start + batch_size])
+        gram += batch.T @ batch
+    s, inv_s, v = gram_eigh(gram, n_components, np.float32)
+    loadings = np.empty((matrix.shape[0], n_components), dtype=np.float32)
+    for start in range(0, matrix.shape[0], batch_size):
+        loadings[start:start + batch_size] = (scale_rows(matrix[start:start + batch_size]) @ v) * inv_s
+    return v * s, loadings
+
+def scatter_samples(ax, coords, labels):
+    ax.scatter(coords[:, 0], coords[:, 1], picker=True)
+    if len(labels) <= MAX_LABELS:
+        for (x, y), t in zip(coords, labels):
+            ax.text(x, y, t, fontsize=8)
+
+def pca_drawing(data, prefix, components, batch_size=None, components_format='csv', gpu=False):
+    sparse = isinstance(data.dtypes.iloc[0], pd.SparseDtype)
+    if batch_size is not None:
+        matrix = data.sparse.to_coo().tocsr() if sparse else data.to_numpy()
+        pca_data, loadings = streamed_pca(matrix, 3, batch_size)
+    elif sparse:
+        scaled_data = data.sparse.to_coo().T.tocsr()
+        _, var = mean_variance_axis(scaled_data, axis=0)
+        std = np.sqrt(var)
+        std[std == 0] = 1
+        inplace_column_scale(scaled_data, 1 / std)
+        pca = TruncatedSVD(n_components=3, random_state=0)
+        pca_data = pca.fit_transform(scaled_data)
+        loadings = pca.components_.T
+    else:
+        scaler = StandardScaler()
+        arr = data.to_numpy(dtype=np.float32, copy=False)
+        scaled_data = scaler.fit_transform(arr.T)
+        if scaled_data.shape[0] <= scaled_data.shape[1]:
+            pca_data, loadings = gram_pca(scaled_data, 3, gpu=gpu)
+        else:
+            pca_data, loadings = randomized_pca(scaled_data, 3, gpu=gpu)
+    pca_df = pd.DataFrame(data=pca_data, columns=PCS, index=data.columns)
+    rows = (','.join([str(name), *map(str, row)]) for name, row in zip(pca_df.index, pca_data))
+    Path(f'{prefix}.csv').write_text(','.join(['', *PCS]) + '\n' + '\n'.join(rows) + '\n')
 
     fig, axs = plt.subplots(2, figsize=(8, 12))
-    axs[0].scatter(pca_df['PC1'], pca_df['PC2'])
-    for i, txt in enumerate(pca_df.index):
-        axs[0].annotate(txt, (pca_df['PC1'][i], pca_df['PC2'][i]))
+    labels = pca_df.index.to_numpy()
+    scatter_samples(axs[0], pca_df[['PC1', 'PC2']].to_numpy(), labels)
     axs[0].set_title('PCA of RNA-seq data: PC1 vs PC2')
     axs[0].set_xlabel('First Principal Component')
     axs[0].set_ylabel('Second Principal Component')
 
-    axs[1].scatter(pca_df['PC1'], pca_df['PC3'])
-    for i, txt in enumerate(pca_df.index):
-        axs[1].annotate(txt, (pca_df['PC1'][i], pca_df['PC3'][i]))
+    scatter_samples(axs[1], pca_df[['PC1', 'PC3']].to_numpy(), labels)
     axs[1].set_title('PCA of RNA-seq data: PC1 vs PC3')
     axs[1].set_xlabel('First Principal Component')
     axs[1].set_ylabel('Third Principal Component')
 
     plt.tight_layout()
-    plt.savefig(f'{prefix}_pca_plots.png', dpi=300)
+    plt.savefig(f'{prefix}_pca_plots.png', dpi=150, pil_kwargs={'compress_level': 1})
+    plt.close(fig)
 
-    components_df = pd.DataFrame(data=pca.components_.T, columns=['PC1', 'PC2', 'PC3'], index=data.index)
-    for component in ['PC1', 'PC2', 'PC3']:
+    components_df = pd.DataFrame(data=loadings, columns=PCS, index=data.index)
+    for component in PCS:
         print(f"\n{component} top genes:")
         top_genes = components_df[component].abs().sort_values(ascending=False).head(10)
         print(top_genes)
         
-    components_df.to_csv(f'{prefix}_components.csv')
+    table = pa.Table.from_pandas(components_df.reset_index(), preserve_index=False)
+    if components_format == 'parquet':
+        pq.write_table(table, f'{prefix}_components.parquet', compression='zstd')
+    else:
+        with open(f'{prefix}_components.csv', 'wb') as f:
+            f.write((','.join([components_df.index.name or '', *PCS]) + '\n').encode())
+            pa_csv.write_csv(table, f, write_options=pa_csv.WriteOptions(include_header=False, quoting_style='none'))
     return 0
 
-def load_microC(filename, chunksize=10000):
-    chunk_list = []
-    for chunk in pd.read_csv(f'{filename}.txt', sep='\t', chunksize=chunksize):
-        chunk = prep(chunk, filename)
-        chunk_list.append(chunk)
-    data = pd.concat(chunk_list, axis=0)
+def cache_path(filename):
+    return f'{filename}.microc_cache.parquet'
+
+def read_cache(filename, bin_size):
+    path = cache_path(filename)
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(f'{filename}.txt'):
+        return None
+    try:
+        table = pq.read_table(path, memory_map=True)
+    except (OSError, pa.ArrowException):
+        return None
+    metadata = table.schema.metadata or {}
+    if (metadata.get(b'microc_bin_size') != str(bin_size).encode()
+            or metadata.get(b'microc_key_layout') != KEY_LAYOUT.encode() or b'microc_short_ends' not in metadata):
+        return None
+    data = table.to_pandas()
+    data.columns = ['chroms', 'bins', filename]
+    data.attrs = {'chroms': json.loads(metadata[b'microc_chroms']),
+                  'chrom_ends': json.loads(metadata[b'microc_chrom_ends']),
+                  'short_ends': json.loads(metadata[b'microc_short_ends'])}
+    return data
+
+def write_cache(data, filename, bin_size):
+    table = pa.Table.from_pandas(data.set_axis(['chroms', 'bins', 'value'], axis=1), preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           b'microc_bin_size': str(bin_size).encode(),
+                                           b'microc_key_layout': KEY_LAYOUT.encode(),
+                                           b'microc_chroms': json.dumps(data.attrs['chroms']).encode(),
+                                           b'microc_chrom_ends': json.dumps(data.attrs['chrom_ends']).encode(),
+                                           b'microc_short_ends': json.dumps(data.attrs['short_ends']).encode()})
+    try:
+        pq.write_table(table, cache_path(filename), compression='zstd')
+    except OSError as e:
+        print(f"Could not write cache for {filename}: {e}")
+
+def load_microC(filename, chunksize=None, bin_size=None, cache=True):
+    if bin_size is None:
+        bin_size = infer_bin_size(filename)
+    if cache:
+        data = read_cache(filename, bin_size)
+        if data is not None:
+            return data
+    chroms, chrom_ends, short_ends = {}, {}, {}
+    if chunksize is not None:
+        with open(f'{filename}.txt', 'rb') as f:
+            n_rows = sum(1 for _ in f) - 1
+        chrom_keys, bin_keys = np.empty(n_rows, dtype=np.int64), np.empty(n_rows, dtype=np.int64)
+        values = np.empty(n_rows, dtype=np.float32)
+        i = 0
+        for chunk in pd.read_csv(f'{filename}.txt', sep='\t', header=0, names=COLS, dtype=DTYPES,
+                                 chunksize=chunksize):
+            chunk = prep(chunk, filename, bin_size, chroms, chrom_ends, short_ends)
+            chrom_keys[i:i + len(chunk)] = chunk['chroms'].to_numpy()
+            bin_keys[i:i + len(chunk)] = chunk['bins'].to_numpy()
+            values[i:i + len(chunk)] = chunk[filename].to_numpy()
+            i += len(chunk)
+        data = pd.DataFrame({'chroms': chrom_keys[:i], 'bins': bin_keys[:i], filename: values[:i]}, copy=False)
+    else:
+        table = pa_csv.read_csv(f'{filename}.txt',
+                                read_options=pa_csv.ReadOptions(block_size=8 << 20, column_names=COLS, skip_rows=1),
+                                parse_options=pa_csv.ParseOptions(delimiter='\t'),
+                                convert_options=pa_csv.ConvertOptions(column_types=SCHEMA))
+        data = prep(table.to_pandas(types_mapper=pd.ArrowDtype), filename, bin_size, chroms, chrom_ends,
+                    short_ends)
+    check_chrom_ends(filename, short_ends, chrom_ends)
+    data.attrs = {'chroms': chroms, 'chrom_ends': chrom_ends, 'short_ends': short_ends}
+    if cache:
+        write_cache(data, filename, bin_size)
     return data
 
-def pca_calculation(*args, prefix="test", chunksize=10000):
-    data = pd.DataFrame(columns=['location'])
-    for arg in args:
-        temp = load_microC(arg, chunksize=chunksize)
-        temp.set_index('location', inplace=True)
-        print(f"Columns to merge: {temp.columns}")
-        data = data.merge(temp, on='location', how='outer').fillna(0)
-    data.set_index('location', inplace=True)
-    pca_drawing(data, prefix, 3)
+def pca_calculation(*args, prefix="test", chunksize=None, sparse=False, bin_size=None, batch_size=None,
+                    cache=True, components_format='csv', gpu=False):
+    if bin_size is None:
+        bin_size = infer_bin_size(args[0])
+    with ProcessPoolExecutor(max_workers=min(len(args), os.cpu_count() or 1)) as ex:
+        loaded = list(ex.map(partial(load_microC, chunksize=chunksize, bin_size=bin_size, cache=cache), args))
+    chroms = order_chroms(name for temp in loaded for name in temp.attrs['chroms'])
+    chrom_ends = {}
+    for temp in loaded:
+        for name, end in temp.attrs['chrom_ends'].items():
+            chrom_ends[name] = max(end, chrom_ends.get(name, 0))
+    chrom_bits, bin_bits = key_bits(len(chroms), -(-max(chrom_ends.values(), default=0) // bin_size))
+    for i, (arg, temp) in enumerate(zip(args, loaded)):
+        check_chrom_ends(arg, temp.attrs['short_ends'], chrom_ends)
+        index = index_locations(temp['chroms'].to_numpy(), temp['bins'].to_numpy(), temp.attrs['chroms'], chroms,
+                                chrom_bits, bin_bits)
+        loaded[i] = pd.DataFrame({arg: temp[arg].to_numpy()}, index=index)
+        print(f"Columns to merge: {loaded[i].columns}")
+    if sparse or batch_size is not None:
+        loc_idx, locations = loaded[0].index.append([temp.index for temp in loaded[1:]]).factorize()
+        samp_idx = np.repeat(np.arange(len(args)), [len(temp) for temp in loaded])
+        values = np.concatenate([temp[arg].to_numpy(dtype=np.float32) for arg, temp in zip(args, loaded)])
+        matrix = sp.coo_matrix((values, (loc_idx, samp_idx)), shape=(len(locations), len(args))).tocsr()
+        data = pd.DataFrame.sparse.from_spmatrix(matrix, index=locations, columns=list(args))
+    else:
+        data = pd.concat(loaded, axis=1).fillna(0).astype(np.float32)
+    data.index = decode_locations(data.index, bin_size, chroms, chrom_ends, chrom_bits, bin_bits)
+    pca_drawing(data, prefix, 3, batch_size=batch_size, components_format=components_format, gpu=gpu)
     return print("the end of command")